@@ -1,14 +1,27 @@
 import time
-import requests
+import array
+import asyncio
+import functools
+import aiohttp
+import math
+import numpy as np
+import orjson
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Event
+import queue
+import sys
+import threading
+import uuid
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Callable, Optional
 
 # Load environment variables
 load_dotenv()
 
+# Answers the API returns with a 200 status when it could not process the image
+_BUSY_ANSWERS = frozenset({
+    "We are resolving some issues. Please try again in a few minutes."
+})
+
 class Config:
     """API configuration settings loaded from environment variables"""
     
@@ -51,14 +64,21 @@ class Config:
         
         # Optional configurations with defaults
         cls.REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "120"))
+        cls.TOKEN_TTL = int(os.getenv("TOKEN_TTL", "600"))
+        cls.ARRIVAL_RATE = float(os.getenv("ARRIVAL_RATE", "0"))
+        cls.FUSE_LEVELS = os.getenv("FUSE_LEVELS", "false").strip().lower() in ("1", "true", "yes")
+        cls.VERBOSE = os.getenv("VERBOSE", "true").strip().lower() in ("1", "true", "yes")
 
 class AuthenticationHandler:
     """Handles authentication and token management"""
     @staticmethod
-    def login_and_get_header() -> Optional[dict]:
+    async def login_and_get_header(log: Callable = print) -> Optional[dict]:
         """
         Authenticates with the API and returns headers with JWT token
         
+        Args:
+            log (Callable): Writes a status message line
+            
         Returns:
             dict: Headers containing the JWT token or None if authentication fails
         """
@@ -68,172 +88,544 @@ class AuthenticationHandler:
         }
         
         try:
-            response = requests.post(f'{Config.BASE_URL_AUTH}/login', json=payload)
-            if response.status_code == 200:
-                jwt = response.cookies.get('jwtToken')
-                print(f"JWT Token obtained successfully")
-                return {'Authorization': f'Bearer {jwt}'}
-            else:
-                print(f"Login failed: {response.status_code} - {response.text}")
-                return None
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    f'{Config.BASE_URL_AUTH}/login',
+                    json=payload,
+                    headers={'Accept': 'application/json'}
+                ) as response:
+                    if response.status == 200:
+                        jwt = response.cookies.get('jwtToken')
+                        log(f"JWT Token obtained successfully")
+                        return {'Authorization': f'Bearer {jwt.value if jwt else None}'}
+                    else:
+                        log(f"Login failed: {response.status} - {response.reason}")
+                        return None
         except Exception as e:
-            print(f"Authentication error: {str(e)}")
+            log(f"Authentication error: {str(e)}")
             return None
 
+class TokenCache:
+    """Caches the authentication headers so login happens once per token lifetime"""
+    def __init__(self, ttl: int = 600, log: Callable = print):
+        self.ttl = ttl
+        self.log = log
+        self._headers = None
+        self._expires_at = 0.0
+        self._pending = None
+
+    async def get(self) -> Optional[dict]:
+        """
+        Returns the cached headers, logging in again only if they have expired
+        
+        Returns:
+            dict: Headers containing the JWT token or None if authentication fails
+        """
+        if self._headers is not None and time.monotonic() < self._expires_at:
+            return self._headers
+
+        # Concurrent callers share a single login instead of each re-authenticating
+        if self._pending is None:
+            self._pending = asyncio.ensure_future(self._refresh())
+        return await self._pending
+
+    def invalidate(self, headers: Optional[dict]) -> None:
+        """
+        Discards the cached headers if they are the ones that were rejected
+        
+        Args:
+            headers (dict): Headers that received an authentication error
+        """
+        if headers is self._headers:
+            self._headers = None
+            self._expires_at = 0.0
+
+    async def _refresh(self) -> Optional[dict]:
+        """Logs in and stores the new headers with their expiry time"""
+        try:
+            headers = await AuthenticationHandler.login_and_get_header(self.log)
+            if headers is not None:
+                self._headers = headers
+                self._expires_at = time.monotonic() + self.ttl
+            return headers
+        finally:
+            # Cleared by the login task itself so a late waiter cannot drop a newer login
+            self._pending = None
+
+class RequestLog:
+    """Writes the test's output to stdout from a background thread"""
+    def __init__(self, verbose: bool = True):
+        # Whether a line is logged for every request; other messages always are
+        self.verbose = verbose
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        """
+        Queues text without blocking the caller on stdout
+        
+        Args:
+            message (str): Text to write, including any trailing newline
+        """
+        self._queue.put(message)
+
+    def write_line(self, message: str) -> None:
+        """
+        Queues a message as a single line, like print() but in one write
+        
+        Args:
+            message (str): Line to write, without the trailing newline
+        """
+        self._queue.put(f"{message}\n")
+
+    def close(self) -> None:
+        """Writes the remaining lines and stops the background thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _drain(self) -> None:
+        """Writes queued lines, flushing stdout whenever the queue runs empty"""
+        while True:
+            message = self._queue.get()
+            if message is None:
+                sys.stdout.flush()
+                return
+            sys.stdout.write(message)
+            if self._queue.empty():
+                sys.stdout.flush()
+
 class RequestHandler:
     """Handles individual API requests"""
     @staticmethod
-    def send_request(headers: dict, start_event: Event, request_number: int) -> dict:
+    async def send_request(post: Callable, token_cache: TokenCache, body: bytes,
+                           request_log: RequestLog, concurrency: int,
+                           request_number: int) -> tuple:
         """
         Sends a single request to the API with image processing
         
         Args:
-            headers (dict): Request headers including authentication
-            start_event (Event): Synchronization event for concurrent requests
+            post (Callable): Session POST bound to the API URL and timeout
+            token_cache (TokenCache): Source of the authentication headers
+            body (bytes): Pre-encoded multipart body carrying the test image
+            request_log (RequestLog): Destination of the per-request log line
+            concurrency (int): Concurrency level the request belongs to
             request_number (int): Identifier for the current request
             
         Returns:
-            dict: Result containing request metrics and response data
+            tuple: Whether the request succeeded and its response time in seconds
         """
-        start_time = time.time()
+        # Fetch (or refresh) the token before timing so a login is never measured
+        headers = await token_cache.get()
+        start_time = time.perf_counter()
         
         try:
-            with open(Config.IMAGE_PATH, 'rb') as image_file:
-                files = {'file': image_file}
-                response = requests.post(
-                    Config.BASE_URL,
-                    files=files,
-                    headers=headers,
-                    timeout=Config.REQUEST_TIMEOUT
-                )
+            status_code, answer = await RequestHandler._post(post, headers, body)
 
-            end_time = time.time()
+            if status_code == 401:
+                # Token rejected by the server: refresh it and retry once, timing
+                # only the retried request so the login is not measured
+                token_cache.invalidate(headers)
+                headers = await token_cache.get()
+                start_time = time.perf_counter()
+                status_code, answer = await RequestHandler._post(post, headers, body)
+
+            end_time = time.perf_counter()
             response_time = end_time - start_time
             
-            # Process response
-            response_data = response.json() if response.status_code == 200 else None
-            answer = response_data.get('answer', 'No response') if response.status_code == 200 else None
-            
             # Check for successful response
-            success = (
-                response.status_code == 200 and 
-                answer != "We are resolving some issues. Please try again in a few minutes."
-            )
-
-            result = {
-                "request_number": request_number,
-                "success": success,
-                "status_code": response.status_code,
-                "response_time": response_time,
-                "response_data": response_data,
-                "answer": answer
-            }
+            success = status_code == 200 and answer not in _BUSY_ANSWERS
             
-            print(f"Request #{request_number}: {result['success']} "
-                  f"(Code: {result['status_code']}, "
-                  f"Time: {result['response_time']:.4f}s, "
-                  f"Response: {result['answer']})")
+            # Only format the log line when it will actually be written
+            if request_log.verbose:
+                request_log.write(f"Request #{request_number} [concurrency {concurrency}]: {success} "
+                                  f"(Code: {status_code}, "
+                                  f"Time: {response_time:.4f}s, "
+                                  f"Response: {answer})\n")
             
-            return result
+            return success, response_time
             
         except Exception as e:
-            print(f"Error in request #{request_number}: {str(e)}")
-            return {
-                "request_number": request_number,
-                "success": False,
-                "status_code": None,
-                "response_time": time.time() - start_time,
-                "response_data": None,
-                "answer": f"Error: {str(e)}"
-            }
+            response_time = time.perf_counter() - start_time
+            if request_log.verbose:
+                request_log.write(f"Error in request #{request_number} "
+                                  f"[concurrency {concurrency}]: {str(e)}\n")
+            return False, response_time
+
+    @staticmethod
+    def encode_image(path: str) -> tuple:
+        """
+        Builds the multipart/form-data body for the test image once
+        
+        Args:
+            path (str): Path to the test image
+            
+        Returns:
+            tuple: Encoded body and the Content-Type header that describes it
+        """
+        boundary = uuid.uuid4().hex
+        filename = os.path.basename(path).replace('"', '%22')
+        with open(path, 'rb') as image_file:
+            content = image_file.read()
+
+        body = b''.join((
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode(),
+            content,
+            f'\r\n--{boundary}--\r\n'.encode()
+        ))
+        return body, f'multipart/form-data; boundary={boundary}'
+
+    @staticmethod
+    async def warmup(post: Callable, token_cache: TokenCache, body: bytes,
+                     connections: int) -> int:
+        """
+        Sends untimed requests all at once so each opens its own pooled connection
+        
+        Args:
+            post (Callable): Session POST bound to the API URL and timeout
+            token_cache (TokenCache): Source of the authentication headers
+            body (bytes): Pre-encoded multipart body carrying the test image
+            connections (int): Number of requests to send together
+            
+        Returns:
+            int: Number of warm-up requests that did not return 200
+        """
+        headers = await token_cache.get()
+        results = await asyncio.gather(*(
+            RequestHandler._post(post, headers, body)
+            for _ in range(connections)
+        ), return_exceptions=True)
+
+        status_codes = [result[0] for result in results if not isinstance(result, BaseException)]
+        if 401 in status_codes:
+            # Refresh now rather than making the first timed requests retry
+            token_cache.invalidate(headers)
+        return len(results) - status_codes.count(200)
+
+    @staticmethod
+    async def _post(post: Callable, headers: Optional[dict], body: bytes) -> tuple:
+        """
+        Posts the test image and reads the response
+        
+        Args:
+            post (Callable): Session POST bound to the API URL and timeout
+            headers (dict): Request headers including authentication
+            body (bytes): Pre-encoded multipart body carrying the test image
+            
+        Returns:
+            tuple: Status code and the body's answer (None unless status is 200)
+        """
+        async with post(data=body, headers=headers) as response:
+            status_code = response.status
+            if status_code != 200:
+                # Failed responses are classified by status alone; the body is never decoded
+                return status_code, None
+            # Only the answer is kept, so the body is decoded straight from bytes
+            answer = orjson.loads(await response.read()).get('answer', 'No response')
+        return status_code, answer
 
 class LoadTester:
     """Manages load testing execution and results"""
-    def __init__(self, headers: dict):
-        self.headers = headers
+    def __init__(self, token_cache: TokenCache, request_log: RequestLog):
+        self.token_cache = token_cache
+        self.request_log = request_log
         self.current_directory = os.path.dirname(os.path.abspath(__file__))
         self.result_file_path = os.path.join(
             self.current_directory,
             'GlauApp_LoadTestsResults.txt'
         )
 
-    def run_load_test(self, num_requests: int, concurrency: int) -> None:
+        # Read and encode the test image once so neither disk I/O nor
+        # multipart encoding happens inside the timed requests
+        self.image_body, self.image_content_type = RequestHandler.encode_image(Config.IMAGE_PATH)
+
+        # Keep-alive connections already opened by an untimed warm-up
+        self.warm_connections = 0
+
+        # Opened last so a failure above leaves previous results untouched.
+        # The file stays open for the whole run and is flushed on close()
+        self.result_file = open(self.result_file_path, 'w', encoding='utf-8', buffering=1 << 16)
+        self.result_file.write("Load Test Results Log:\n")
+
+    def close(self) -> None:
+        """Flushes the logs and closes the results file"""
+        self.request_log.close()
+        self.result_file.close()
+
+    async def run_all(self, num_requests: int, concurrency_levels: list) -> None:
+        """
+        Runs the load test for every concurrency level over one shared session
+        
+        Args:
+            num_requests (int): Total number of requests to send per level
+            concurrency_levels (list): Concurrency levels to test, in order
+        """
+        # Fused levels run side by side, so the pool must hold all of them at once
+        pool_size = sum(concurrency_levels) if Config.FUSE_LEVELS else max(concurrency_levels)
+        # Keep-alive pool sized to the highest concurrency level and kept open
+        # across levels, so warm sockets are reused instead of new TCP handshakes
+        connector = aiohttp.TCPConnector(
+            limit=pool_size,
+            limit_per_host=pool_size,
+            keepalive_timeout=Config.REQUEST_TIMEOUT
+        )
+        # The JWT travels in the Authorization header, so response cookies are
+        # dropped and bodies are requested uncompressed to skip client-side gzip
+        headers = {
+            'Connection': 'keep-alive',
+            'Accept': 'application/json',
+            'Accept-Encoding': 'identity',
+            'Content-Type': self.image_content_type
+        }
+        cookie_jar = aiohttp.DummyCookieJar()
+
+        async with aiohttp.ClientSession(
+            headers=headers,
+            connector=connector,
+            cookie_jar=cookie_jar
+        ) as session:
+            # Everything but the body and auth headers is bound once for all requests
+            post = functools.partial(
+                session.post,
+                Config.BASE_URL,
+                timeout=aiohttp.ClientTimeout(total=Config.REQUEST_TIMEOUT),
+                allow_redirects=False
+            )
+            if Config.FUSE_LEVELS:
+                await self.run_fused_load_test(post, num_requests, concurrency_levels)
+            else:
+                for concurrency in concurrency_levels:
+                    await self.run_load_test(post, num_requests, concurrency)
+
+    async def run_load_test(self, post: Callable, num_requests: int,
+                            concurrency: int) -> None:
         """
         Executes load test with specified parameters
         
         Args:
+            post (Callable): Session POST bound to the API URL and timeout
             num_requests (int): Total number of requests to send
             concurrency (int): Number of concurrent requests
         """
-        if self.headers is None:
-            print("Authentication failed. Test aborted.")
+        # Refresh an expired token here so login never lands in the timed requests
+        if await self.token_cache.get() is None:
+            self.request_log.write_line("Authentication failed. Test aborted.")
             return
 
-        response_times = []
-        errors = 0
-        results = []
-        start_event = Event()
+        await self.warmup(post, concurrency)
+        level_times = await self._execute_level(post, num_requests, concurrency)
+        self._save_level_results(level_times, num_requests, concurrency)
+
+    async def run_fused_load_test(self, post: Callable, num_requests: int,
+                                  concurrency_levels: list) -> None:
+        """
+        Executes every concurrency level at the same time and reports each separately
+        
+        Levels share the network and the server while they run, so their
+        numbers are not independent; this trades isolation for total run time.
+        
+        Args:
+            post (Callable): Session POST bound to the API URL and timeout
+            num_requests (int): Total number of requests to send per level
+            concurrency_levels (list): Concurrency levels to test
+        """
+        # Refresh an expired token here so login never lands in the timed requests
+        if await self.token_cache.get() is None:
+            self.request_log.write_line("Authentication failed. Test aborted.")
+            return
 
-        # Execute concurrent requests
-        with ThreadPoolExecutor(max_workers=concurrency) as executor:
-            futures = [
-                executor.submit(RequestHandler.send_request, self.headers, start_event, i + 1)
-                for i in range(num_requests)
-            ]
+        # Only DNS and the first connection are warmed; a full-width warm-up
+        # would put a burst of every level's requests on the server first
+        await self.warmup(post, 1)
+        level_times = await asyncio.gather(*(
+            self._execute_level(post, num_requests, concurrency)
+            for concurrency in concurrency_levels
+        ))
 
-            start_event.set()
+        for concurrency, times in zip(concurrency_levels, level_times):
+            self._save_level_results(times, num_requests, concurrency)
 
-            for future in as_completed(futures):
-                result = future.result()
-                results.append(result)
+    async def warmup(self, post: Callable, connections: int) -> None:
+        """
+        Opens, untimed, the pooled connections a level needs beyond those already warm
+        
+        Keep-alive sockets from earlier levels are reused, so only the
+        difference is opened; the first call also covers the DNS lookup.
+        
+        Args:
+            post (Callable): Session POST bound to the API URL and timeout
+            connections (int): Number of connections the next requests will use at once
+        """
+        new_connections = connections - self.warm_connections
+        if new_connections <= 0:
+            return
 
-                if result["success"]:
-                    response_times.append(result["response_time"])
-                else:
-                    errors += 1
+        failures = await RequestHandler.warmup(post, self.token_cache, self.image_body,
+                                               new_connections)
+        self.warm_connections = connections
+        if failures:
+            self.request_log.write_line(
+                f"Warm-up: {failures} of {new_connections} requests failed"
+            )
+
+    async def _execute_level(self, post: Callable, num_requests: int,
+                             concurrency: int) -> tuple:
+        """
+        Sends the requests of one concurrency level through a queue of workers
+        
+        Args:
+            post (Callable): Session POST bound to the API URL and timeout
+            num_requests (int): Total number of requests to send
+            concurrency (int): Number of concurrent requests
+            
+        Returns:
+            tuple: Response times and latencies indexed by request number, NaN for failures
+        """
+        request_queue = asyncio.Queue()
+        # Preallocated slots that each worker fills in place for its request number
+        response_times = array.array('d', [math.nan]) * num_requests
+        latencies = array.array('d', [math.nan]) * num_requests
+
+        # `concurrency` workers drain the queue, so at most that many are in flight
+        workers = [
+            asyncio.ensure_future(self._worker(
+                post, request_queue, concurrency, response_times, latencies
+            ))
+            for _ in range(concurrency)
+        ]
+
+        # Let every worker park on the queue before requests start arriving,
+        # so a burst is picked up by all of them at once
+        await asyncio.sleep(0)
+
+        await self._produce(request_queue, num_requests, Config.ARRIVAL_RATE)
+        await request_queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        return response_times, latencies
+
+    def _save_level_results(self, level_times: tuple, num_requests: int,
+                            concurrency: int) -> None:
+        """
+        Saves the statistics of one concurrency level
+        
+        Args:
+            level_times (tuple): Response times and latencies per request, NaN for failures
+            num_requests (int): Total number of requests
+            concurrency (int): Number of concurrent requests
+        """
+        # Zero-copy views over the workers' buffers
+        response_times, latencies = (
+            np.frombuffer(times, dtype=np.float64) for times in level_times
+        )
+        errors = int(np.isnan(response_times).sum())
 
         # Calculate statistics
         self._calculate_and_save_results(
             response_times,
+            latencies,
             errors,
             num_requests,
             concurrency
         )
 
-    def _calculate_and_save_results(self, response_times: list, errors: int, 
-                                  num_requests: int, concurrency: int) -> None:
+    @staticmethod
+    async def _produce(request_queue: asyncio.Queue, num_requests: int,
+                       arrival_rate: float) -> None:
+        """
+        Enqueues requests at a fixed arrival rate, or all at once if the rate is 0
+        
+        Args:
+            request_queue (asyncio.Queue): Queue drained by the workers
+            num_requests (int): Total number of requests to enqueue
+            arrival_rate (float): Requests per second (0 for a single burst)
+        """
+        interval = 1 / arrival_rate if arrival_rate > 0 else 0
+        start_time = time.perf_counter()
+
+        for i in range(num_requests):
+            # Each item carries its arrival time so queueing delay can be measured
+            request_queue.put_nowait((i + 1, time.perf_counter()))
+            if interval:
+                # Sleep against the schedule rather than a fixed delay to avoid drift
+                await asyncio.sleep(max(0, start_time + (i + 1) * interval - time.perf_counter()))
+
+    async def _worker(self, post: Callable, request_queue: asyncio.Queue, concurrency: int,
+                      response_times: array.array, latencies: array.array) -> None:
+        """
+        Sends queued requests one at a time until cancelled
+        
+        Args:
+            post (Callable): Session POST bound to the API URL and timeout
+            request_queue (asyncio.Queue): Queue of (request number, arrival time) items
+            concurrency (int): Concurrency level of the queue, shown in the request log
+            response_times (array.array): Response time slots, left NaN for failed requests
+            latencies (array.array): Arrival-to-completion slots, left NaN for failed requests
+        """
+        while True:
+            request_number, arrival_time = await request_queue.get()
+            try:
+                success, response_time = await RequestHandler.send_request(
+                    post, self.token_cache, self.image_body, self.request_log,
+                    concurrency, request_number
+                )
+                if success:
+                    # Latency spans arrival to completion, including time spent queued
+                    latencies[request_number - 1] = time.perf_counter() - arrival_time
+                    response_times[request_number - 1] = response_time
+            finally:
+                request_queue.task_done()
+
+    def _calculate_and_save_results(self, response_times: np.ndarray, latencies: np.ndarray,
+                                  errors: int, num_requests: int, concurrency: int) -> None:
         """
         Calculates and saves test results
         
         Args:
-            response_times (list): List of response times
+            response_times (np.ndarray): Response time per request, NaN for failed requests
+            latencies (np.ndarray): Arrival-to-completion time per request, NaN for failed requests
             errors (int): Number of failed requests
             num_requests (int): Total number of requests
             concurrency (int): Number of concurrent requests
         """
-        if response_times:
+        successful = response_times[~np.isnan(response_times)]
+        if successful.size:
+            p50, p95, p99 = np.percentile(successful, [50, 95, 99])
             stats = {
-                'avg': sum(response_times) / len(response_times),
-                'max': max(response_times),
-                'min': min(response_times)
+                'avg': float(successful.mean()),
+                'max': float(successful.max()),
+                'min': float(successful.min()),
+                'std': float(successful.std()),
+                'p50': float(p50),
+                'p95': float(p95),
+                'p99': float(p99)
             }
+            successful_latencies = latencies[~np.isnan(latencies)]
+            stats['latency_avg'] = float(successful_latencies.mean())
+            stats['latency_p95'] = float(np.percentile(successful_latencies, 95))
         else:
-            stats = {'avg': 0, 'max': 0, 'min': 0}
-
-        # Save results to file
-        with open(self.result_file_path, 'a', encoding='utf-8') as f:
-            f.write(f"\nLoad Test Results - {num_requests} requests with {concurrency} threads:\n")
-            f.write(f"Response times: min={stats['min']:.4f}s, max={stats['max']:.4f}s, "
-                   f"avg={stats['avg']:.4f}s\n")
-            f.write(f"Successful requests: {len(response_times)}\n")
-            f.write(f"Failed requests: {errors}\n")
-
-        # Display results
-        print(f"\nLoad Test Results - {num_requests} requests with {concurrency} threads:")
-        print(f"Response times: min={stats['min']:.4f}s, max={stats['max']:.4f}s, "
-              f"avg={stats['avg']:.4f}s")
-        print(f"Successful requests: {len(response_times)}")
-        print(f"Failed requests: {errors}")
+            stats = dict.fromkeys(
+                ('avg', 'max', 'min', 'std', 'p50', 'p95', 'p99', 'latency_avg', 'latency_p95'), 0
+            )
+
+        summary = (
+            f"\nLoad Test Results - {num_requests} requests with {concurrency} threads:\n"
+            f"Response times: min={stats['min']:.4f}s, max={stats['max']:.4f}s, "
+            f"avg={stats['avg']:.4f}s, std={stats['std']:.4f}s\n"
+            f"Percentiles: p50={stats['p50']:.4f}s, p95={stats['p95']:.4f}s, "
+            f"p99={stats['p99']:.4f}s\n"
+            f"Latency (arrival to completion): avg={stats['latency_avg']:.4f}s, "
+            f"p95={stats['latency_p95']:.4f}s\n"
+            f"Successful requests: {successful.size}\n"
+            f"Failed requests: {errors}\n"
+        )
+
+        # Save results to file and display them after the pending request logs
+        self.result_file.write(summary)
+        self.request_log.write(summary)
 
 def main():
     """Main execution function"""
@@ -241,23 +633,24 @@ def main():
         # Initialize configuration from environment variables
         Config.initialize()
         
+        # Output goes through one writer thread so lines never interleave
+        request_log = RequestLog(Config.VERBOSE)
+        
         # Initialize authentication
-        headers = AuthenticationHandler.login_and_get_header()
+        token_cache = TokenCache(Config.TOKEN_TTL, request_log.write_line)
         
         # Test configuration
         num_requests = 100
         concurrency_levels = [1, 5, 10, 25, 50, 75, 100]
         
-        # Initialize load tester
-        load_tester = LoadTester(headers)
+        # Initialize load tester (clears previous results file)
+        load_tester = LoadTester(token_cache, request_log)
         
-        # Clear previous results file
-        with open(load_tester.result_file_path, 'w', encoding='utf-8') as f:
-            f.write("Load Test Results Log:\n")
-        
-        # Run tests for each concurrency level
-        for concurrency in concurrency_levels:
-            load_tester.run_load_test(num_requests, concurrency)
+        # Run tests for each concurrency level on a single event loop
+        try:
+            asyncio.run(load_tester.run_all(num_requests, concurrency_levels))
+        finally:
+            load_tester.close()
             
     except ValueError as e:
         print(f"Configuration error: {str(e)}")